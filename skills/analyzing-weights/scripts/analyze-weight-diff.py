@@ -11,136 +11,232 @@ Usage:
 
   # Adjust the threshold for flagging changes (default: 50%):
   python3 scripts/analyze-weight-diff.py --threshold 30
+
+  # Reuse parsed results across runs on the same diff (default dir: ~/.cache/moonbeam-weights):
+  python3 scripts/analyze-weight-diff.py --file weight_diff.txt --cache
 """
 
 import argparse
+import functools
+import hashlib
+import os
+import pickle
 import re
+import statistics
 import sys
 from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import chain
 
+# ---------------------------------------------------------------------------
+# Patterns
+# ---------------------------------------------------------------------------
 
-def parse_weight_block(lines):
-    """Parse diff lines belonging to one function and extract weight components."""
-    result = {
-        "base_ref": 0,
-        "base_proof": 0,
-        "min_execution_time": None,
-        "ref_multipliers": {},
-        "proof_multipliers": {},
-        "db_reads_base": 0,
-        "db_reads_per_var": {},
-    }
-
-    for line in lines:
-        clean = line.strip()
-
-        min_match = re.search(
-            r"Minimum execution time:\s*([\d_]+)\s*picoseconds", clean
+_RE_MIN_EXEC = re.compile(r"Minimum execution time:\s*([\d_]+)\s*picoseconds")
+_RE_BASE_WEIGHT = re.compile(r"Weight::from_parts\(\s*([\d_]+)\s*,\s*([\d_]+)\s*\)")
+# The .saturating_add(...) multiplier and .reads(...) families share one
+# alternation; Minimum execution time and the base Weight::from_parts stay
+# separate so each keeps its own leading-literal fast path.
+_RE_COMBINED = re.compile(
+    # .saturating_add(Weight::from_parts(X, Y).saturating_mul(VAR.into()))
+    r"(?P<mul>\.saturating_add\(Weight::from_parts\("
+    r"\s*(?P<mul_ref>[\d_]+)\s*,\s*(?P<mul_proof>[\d_]+)\s*\)"
+    r"\.saturating_mul\((?P<mul_var>\w+)\.into\(\)\)\))"
+    # Per-var DB reads: .reads((N_u64).saturating_mul(VAR...))
+    r"|(?P<rv>\.reads\(\((?P<rv_count>\d+)_u64\)\.saturating_mul\((?P<rv_var>\w+))"
+    # Base DB reads: .reads(N_u64)
+    r"|(?P<rb>\.reads\((?P<rb_count>\d+)_u64\))"
+)
+_RE_HUNK_FN = re.compile(r"fn (\w+)")
+_RE_FN_DEF = re.compile(r"fn (\w+)\s*\(")
+_RE_DIFFGIT = re.compile(r"b/(runtime/\S+)")
+
+_DROP_UNDERSCORE = str.maketrans("", "", "_")
+
+_FILE_SEP = "\ndiff --git "
+_READ_CHUNK = 1 << 20
+
+# Bump when the cached change records or the way they are parsed change.
+_CACHE_VERSION = b"2"
+_DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "moonbeam-weights")
+
+
+@functools.lru_cache(maxsize=8192)
+def _pw(literal):
+    """Parse a Rust integer literal such as ``25_000_000``.
+
+    The same base weights and multipliers recur across hunks and runtimes,
+    so the conversions are memoized.
+    """
+    return int(literal.translate(_DROP_UNDERSCORE))
+
+
+@dataclass(slots=True)
+class WeightBlock:
+    """Weight components of one side (old or new) of a function's diff."""
+
+    base_ref: int = 0
+    base_proof: int = 0
+    min_execution_time: int | None = None
+    ref_multipliers: dict = field(default_factory=dict)
+    proof_multipliers: dict = field(default_factory=dict)
+    db_reads_base: int = 0
+    db_reads_per_var: dict = field(default_factory=dict)
+
+    def has_weights(self):
+        return (
+            self.base_ref > 0
+            or self.min_execution_time is not None
+            or bool(self.ref_multipliers)
         )
-        if min_match:
-            result["min_execution_time"] = int(min_match.group(1).replace("_", ""))
-            continue
 
-        # Base Weight::from_parts — first occurrence NOT inside a saturating_add
-        if "saturating_add" not in clean:
-            base_match = re.search(
-                r"Weight::from_parts\(\s*([\d_]+)\s*,\s*([\d_]+)\s*\)", clean
-            )
-            if base_match:
-                result["base_ref"] = int(base_match.group(1).replace("_", ""))
-                result["base_proof"] = int(base_match.group(2).replace("_", ""))
-                continue
-
-        # .saturating_add(Weight::from_parts(X, Y).saturating_mul(VAR.into()))
-        mul_match = re.search(
-            r"\.saturating_add\(Weight::from_parts\(\s*([\d_]+)\s*,\s*([\d_]+)\s*\)"
-            r"\.saturating_mul\((\w+)\.into\(\)\)\)",
-            clean,
-        )
-        if mul_match:
-            ref_val = int(mul_match.group(1).replace("_", ""))
-            proof_val = int(mul_match.group(2).replace("_", ""))
-            var_name = mul_match.group(3)
-            if ref_val > 0:
-                result["ref_multipliers"][var_name] = ref_val
-            if proof_val > 0:
-                result["proof_multipliers"][var_name] = proof_val
-            continue
 
-        # Per-var DB reads: .reads((N_u64).saturating_mul(VAR...))
-        reads_match = re.search(
-            r"\.reads\(\((\d+)_u64\)\.saturating_mul\((\w+)", clean
-        )
-        if reads_match:
-            result["db_reads_per_var"][reads_match.group(2)] = int(
-                reads_match.group(1)
-            )
+def _split_file_sections(chunks):
+    """Yield the text of each ``diff --git`` section from a stream of text blocks.
+
+    Delimiters are located with str.find on whole blocks, so only the section
+    currently being assembled is held in memory.
+    """
+    keep = len(_FILE_SEP) - 1
+    parts = []
+    # A virtual leading newline lets a diff that starts at offset 0 match too.
+    carry = "\n"
+    for chunk in chunks:
+        buf = carry + chunk
+        start = 0
+        idx = buf.find(_FILE_SEP)
+        while idx != -1:
+            parts.append(buf[start : idx + 1])
+            yield "".join(parts)
+            parts = []
+            start = idx + 1
+            idx = buf.find(_FILE_SEP, start)
+        # The tail may hold the beginning of a delimiter split across blocks.
+        tail = max(start, len(buf) - keep)
+        parts.append(buf[start:tail])
+        carry = buf[tail:]
+    parts.append(carry)
+    yield "".join(parts)
+
+
+def iter_file_diffs(chunks):
+    """Yield (filepath, lines) for each runtime file in a unified diff."""
+    for section in _split_file_sections(chunks):
+        if not section.startswith("diff --git"):
+            # Anything before the first file header
             continue
-
-        # Base DB reads: .reads(N_u64)
-        reads_base_match = re.search(r"\.reads\((\d+)_u64\)", clean)
-        if reads_base_match and "saturating_mul" not in clean:
-            result["db_reads_base"] = int(reads_base_match.group(1))
-
-    return result
+        lines = section.split("\n")
+        match = _RE_DIFFGIT.search(lines[0])
+        if match:
+            yield match.group(1), lines
 
 
 def extract_function_diffs(file_lines):
-    """Extract per-function old/new weight blocks from unified diff lines."""
+    """Extract per-function old/new weight blocks from unified diff lines.
+
+    Removed and added lines are parsed as they are read, updating the current
+    function's old and new blocks in place.
+    """
     current_fn = None
-    fn_removed_lines = defaultdict(list)
-    fn_added_lines = defaultdict(list)
+    fn_old = defaultdict(WeightBlock)
+    fn_new = defaultdict(WeightBlock)
+    old_block = new_block = None
+
+    # Local names are cheaper to look up than module attributes in the loop.
+    hunk_search = _RE_HUNK_FN.search
+    fn_def_match = _RE_FN_DEF.match
+    min_search = _RE_MIN_EXEC.search
+    base_search = _RE_BASE_WEIGHT.search
+    combined_search = _RE_COMBINED.search
+    pw = _pw
 
     for line in file_lines:
-        if line.startswith("---") or line.startswith("+++") or line.startswith("index "):
-            continue
+        first = line[:1]
 
-        if line.startswith("@@"):
-            hunk_fn = re.search(r"fn (\w+)", line)
+        if first == "@":
+            hunk_fn = hunk_search(line)
             if hunk_fn:
                 current_fn = hunk_fn.group(1)
+                old_block = fn_old[current_fn]
+                new_block = fn_new[current_fn]
             continue
 
-        content = line[1:] if line and line[0] in " +-" else line
-        fn_match = re.match(r"\s*fn (\w+)\s*\(", content)
-        if fn_match:
-            current_fn = fn_match.group(1)
-
-        if current_fn is None:
+        if first == "-":
+            if line[:3] == "---":
+                continue
+        elif first == "+":
+            if line[:3] == "+++":
+                continue
+        elif first != " ":
+            # "index ..." headers, "\ No newline at end of file", blank lines
             continue
 
-        if line.startswith("-") and not line.startswith("---"):
-            fn_removed_lines[current_fn].append(line[1:])
-        elif line.startswith("+") and not line.startswith("+++"):
-            fn_added_lines[current_fn].append(line[1:])
+        clean = line[1:].strip()
+        if clean.startswith("fn "):
+            fn_match = fn_def_match(clean)
+            if fn_match:
+                current_fn = fn_match.group(1)
+                old_block = fn_old[current_fn]
+                new_block = fn_new[current_fn]
 
-    result = {}
-    all_fns = set(fn_removed_lines.keys()) | set(fn_added_lines.keys())
+        if current_fn is None or first == " ":
+            continue
 
-    for fn_name in all_fns:
-        removed = fn_removed_lines.get(fn_name, [])
-        added = fn_added_lines.get(fn_name, [])
-        if not removed and not added:
+        block = old_block if first == "-" else new_block
+
+        lead = clean[:1]
+        if not lead:
+            continue
+        if lead == "/":
+            # Comment lines (storage docs, measured/estimated sizes) only carry
+            # the minimum execution time; the weight expressions live in code.
+            if "Minimum execution time" in clean:
+                min_match = min_search(clean)
+                if min_match:
+                    block.min_execution_time = pw(min_match.group(1))
             continue
 
-        old_block = parse_weight_block(removed)
-        new_block = parse_weight_block(added)
+        # Cheap substring checks reject the remaining non-weight lines
+        # before any regex engine is entered.
+        has_parts = "from_parts" in clean
+        has_reads = "reads(" in clean
+        if not has_parts and not has_reads:
+            continue
 
-        has_old = (
-            old_block["base_ref"] > 0
-            or old_block["min_execution_time"] is not None
-            or old_block["ref_multipliers"]
-        )
-        has_new = (
-            new_block["base_ref"] > 0
-            or new_block["min_execution_time"] is not None
-            or new_block["ref_multipliers"]
-        )
+        # Base Weight::from_parts — first occurrence NOT inside a saturating_add
+        if has_parts and "saturating_add" not in clean:
+            base_match = base_search(clean)
+            if base_match:
+                block.base_ref = pw(base_match.group(1))
+                block.base_proof = pw(base_match.group(2))
+                continue
 
-        if has_old or has_new:
-            result[fn_name] = (old_block, new_block)
+        match = combined_search(clean)
+        if not match:
+            continue
 
-    return result
+        kind = match.lastgroup
+        if kind == "mul":
+            ref_val = pw(match.group("mul_ref"))
+            proof_val = pw(match.group("mul_proof"))
+            var_name = match.group("mul_var")
+            if ref_val > 0:
+                block.ref_multipliers[var_name] = ref_val
+            if proof_val > 0:
+                block.proof_multipliers[var_name] = proof_val
+        elif kind == "rv":
+            block.db_reads_per_var[match.group("rv_var")] = int(
+                match.group("rv_count")
+            )
+        elif "saturating_mul" not in clean:
+            block.db_reads_base = int(match.group("rb_count"))
+
+    # fn_old and fn_new are always populated together, so they share keys.
+    return {
+        fn_name: (old, fn_new[fn_name])
+        for fn_name, old in fn_old.items()
+        if old.has_weights() or fn_new[fn_name].has_weights()
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -153,6 +249,16 @@ def pct(old, new):
     return ((new - old) / old) * 100
 
 
+@functools.lru_cache(maxsize=1024)
+def _fmt_int(n):
+    """Format a non-negative int with comma thousands separators."""
+    s = str(n)
+    if len(s) <= 3:
+        return s
+    first = len(s) % 3 or 3
+    return s[:first] + "".join("," + s[i : i + 3] for i in range(first, len(s), 3))
+
+
 def format_weight(val):
     if val >= 1_000_000_000:
         return f"{val / 1_000_000_000:.1f}B"
@@ -167,6 +273,76 @@ def format_weight(val):
 # Main
 # ---------------------------------------------------------------------------
 
+def collect_changes(chunks):
+    """Build one change record per runtime weight function found in the diff."""
+    all_changes = []
+    for filepath, flines in iter_file_diffs(chunks):
+        parts = filepath.split("/")
+        runtime = parts[1] if len(parts) > 1 else "unknown"
+        pallet = parts[-1].replace(".rs", "") if parts else "unknown"
+
+        fn_diffs = extract_function_diffs(flines)
+        for fn_name, (old, new) in fn_diffs.items():
+            # Percentages shared by several sections are computed once here;
+            # None means the pair is not comparable.
+            old_ref, new_ref = old.base_ref, new.base_ref
+            old_min, new_min = old.min_execution_time, new.min_execution_time
+            all_changes.append(
+                {
+                    "runtime": runtime,
+                    "pallet": pallet,
+                    "function": fn_name,
+                    "old": old,
+                    "new": new,
+                    "base_pct": (
+                        pct(old_ref, new_ref) if old_ref > 0 and new_ref > 0 else None
+                    ),
+                    "min_pct": (
+                        pct(old_min, new_min)
+                        if old_min and new_min and old_min > 0
+                        else None
+                    ),
+                }
+            )
+
+    return all_changes
+
+
+def load_or_collect_changes(chunks, cache_dir):
+    """Return collect_changes(chunks), reusing a cached copy keyed by the diff hash."""
+    digest = hashlib.blake2b(_CACHE_VERSION, digest_size=16)
+    for chunk in chunks:
+        digest.update(chunk.encode())
+    cache_dir = os.path.expanduser(cache_dir)
+    path = os.path.join(cache_dir, f"{digest.hexdigest()}.pkl")
+
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        # Corrupt or written by an incompatible version: rebuild it.
+        print(f"Ignoring unreadable cache entry {path}: {e}", file=sys.stderr)
+
+    all_changes = collect_changes(chunks)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(all_changes, f, protocol=5)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # The report does not depend on the cache, so carry on without it.
+        print(f"Could not write cache entry {path}: {e}", file=sys.stderr)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return all_changes
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Analyze Substrate weight file diffs for significant changes."
@@ -183,180 +359,161 @@ def main():
         default=50.0,
         help="Percentage threshold for flagging changes (default: 50).",
     )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=_DEFAULT_CACHE_DIR,
+        metavar="DIR",
+        help=(
+            "Cache parsed results in DIR, keyed by a hash of the diff, and reuse "
+            f"them on later runs (default DIR: {_DEFAULT_CACHE_DIR})."
+        ),
+    )
     args = parser.parse_args()
     threshold = args.threshold
 
-    if args.file:
-        with open(args.file, "r") as f:
-            diff_text = f.read()
-    else:
-        diff_text = sys.stdin.read()
-
-    if not diff_text.strip():
-        print("No diff input provided. Pipe a git diff or use --file.")
-        sys.exit(1)
-
-    lines = diff_text.split("\n")
-
-    # Split into per-file diffs
-    file_diffs = {}
-    current_file = None
-    current_lines = []
-
-    for line in lines:
-        if line.startswith("diff --git"):
-            if current_file and current_lines:
-                file_diffs[current_file] = current_lines
-            match = re.search(r"b/(runtime/\S+)", line)
-            current_file = match.group(1) if match else None
-            current_lines = []
-        elif current_file is not None:
-            current_lines.append(line)
-
-    if current_file and current_lines:
-        file_diffs[current_file] = current_lines
-
-    all_changes = []
-    for filepath, flines in file_diffs.items():
-        parts = filepath.split("/")
-        runtime = parts[1] if len(parts) > 1 else "unknown"
-        pallet = parts[-1].replace(".rs", "") if parts else "unknown"
-
-        fn_diffs = extract_function_diffs(flines)
-        for fn_name, (old, new) in fn_diffs.items():
-            all_changes.append(
-                {
-                    "runtime": runtime,
-                    "pallet": pallet,
-                    "function": fn_name,
-                    "old": old,
-                    "new": new,
-                }
-            )
+    source = open(args.file, "r") if args.file else sys.stdin
+    with source:
+        chunks = iter(lambda: source.read(_READ_CHUNK), "")
+        for first_chunk in chunks:
+            if first_chunk.strip():
+                break
+        else:
+            print("No diff input provided. Pipe a git diff or use --file.")
+            sys.exit(1)
+
+        chunks = chain([first_chunk], chunks)
+        if args.cache:
+            # The whole diff must be hashed before it can be looked up.
+            all_changes = load_or_collect_changes(list(chunks), args.cache)
+        else:
+            all_changes = collect_changes(chunks)
+
+    # Partition once so each section only walks the changes it can report on.
+    base_changes = []
+    timed_changes = []
+    mul_changes = []
+    proof_changes = []
+    for c in all_changes:
+        if c["base_pct"] is not None:
+            base_changes.append(c)
+        if c["min_pct"] is not None:
+            timed_changes.append(c)
+        if c["old"].ref_multipliers or c["new"].ref_multipliers:
+            mul_changes.append(c)
+        if c["old"].proof_multipliers or c["new"].proof_multipliers:
+            proof_changes.append(c)
+
+    # The report is collected and written in one go rather than line by line.
+    buf = []
+    emit = buf.append
 
     sep = "=" * 120
-    print(sep)
-    print(f"WEIGHT DIFF ANALYSIS (threshold: {threshold:.0f}%)")
-    print(sep)
+    emit(sep)
+    emit(f"WEIGHT DIFF ANALYSIS (threshold: {threshold:.0f}%)")
+    emit(sep)
 
     # ------------------------------------------------------------------
     # OVERALL STATS
     # ------------------------------------------------------------------
     total = len(all_changes)
-    min_changes = []
-    for c in all_changes:
-        old_min = c["old"]["min_execution_time"]
-        new_min = c["new"]["min_execution_time"]
-        if old_min and new_min and old_min > 0:
-            min_changes.append(pct(old_min, new_min))
+    min_changes = [c["min_pct"] for c in timed_changes]
 
-    print(f"\nTotal weight functions with changes: {total}")
+    emit(f"\nTotal weight functions with changes: {total}")
 
     if min_changes:
         ups = len([p for p in min_changes if p > 0])
         downs = len([p for p in min_changes if p < 0])
         avg = sum(min_changes) / len(min_changes)
-        sorted_mc = sorted(min_changes)
-        median = sorted_mc[len(sorted_mc) // 2]
-        print(f"\n  Minimum execution time summary:")
-        print(f"    Increases: {ups}, Decreases: {downs}")
-        print(f"    Average: {avg:+.1f}%, Median: {median:+.1f}%")
-        print(f"    Range: {min(min_changes):+.1f}% to {max(min_changes):+.1f}%")
+        median = statistics.median(min_changes)
+        emit(f"\n  Minimum execution time summary:")
+        emit(f"    Increases: {ups}, Decreases: {downs}")
+        emit(f"    Average: {avg:+.1f}%, Median: {median:+.1f}%")
+        emit(f"    Range: {min(min_changes):+.1f}% to {max(min_changes):+.1f}%")
 
     # ------------------------------------------------------------------
     # 1. BASE ref_time INCREASES > threshold
     # ------------------------------------------------------------------
-    print(f"\n{sep}")
-    print(f"SECTION 1: BASE ref_time INCREASE > {threshold:.0f}%")
-    print(sep)
+    emit(f"\n{sep}")
+    emit(f"SECTION 1: BASE ref_time INCREASE > {threshold:.0f}%")
+    emit(sep)
 
-    sig_base_inc = []
-    for c in all_changes:
-        if c["old"]["base_ref"] > 0 and c["new"]["base_ref"] > 0:
-            p = pct(c["old"]["base_ref"], c["new"]["base_ref"])
-            if p > threshold:
-                sig_base_inc.append((c, p))
+    sig_base_inc = [
+        (c, c["base_pct"]) for c in base_changes if c["base_pct"] > threshold
+    ]
     sig_base_inc.sort(key=lambda x: x[1], reverse=True)
 
     if sig_base_inc:
         for c, p in sig_base_inc:
-            print(f"  [{c['runtime']}] {c['pallet']}::{c['function']}")
-            print(
-                f"    base ref_time: {c['old']['base_ref']:,} -> {c['new']['base_ref']:,} ({p:+.1f}%)"
+            emit(f"  [{c['runtime']}] {c['pallet']}::{c['function']}")
+            emit(
+                f"    base ref_time: {_fmt_int(c['old'].base_ref)} -> {_fmt_int(c['new'].base_ref)} ({p:+.1f}%)"
             )
-            if c["old"]["min_execution_time"] and c["new"]["min_execution_time"]:
-                mp = pct(c["old"]["min_execution_time"], c["new"]["min_execution_time"])
-                print(
-                    f"    min exec time: {c['old']['min_execution_time']:,} -> {c['new']['min_execution_time']:,} ({mp:+.1f}%)"
+            mp = c["min_pct"]
+            if mp is not None:
+                emit(
+                    f"    min exec time: {_fmt_int(c['old'].min_execution_time)} -> {_fmt_int(c['new'].min_execution_time)} ({mp:+.1f}%)"
                 )
     else:
-        print("  None found.")
+        emit("  None found.")
 
     # ------------------------------------------------------------------
     # 2. BASE ref_time DECREASES > threshold
     # ------------------------------------------------------------------
-    print(f"\n{sep}")
-    print(f"SECTION 2: BASE ref_time DECREASE > {threshold:.0f}%")
-    print(sep)
+    emit(f"\n{sep}")
+    emit(f"SECTION 2: BASE ref_time DECREASE > {threshold:.0f}%")
+    emit(sep)
 
-    sig_base_dec = []
-    for c in all_changes:
-        if c["old"]["base_ref"] > 0 and c["new"]["base_ref"] > 0:
-            p = pct(c["old"]["base_ref"], c["new"]["base_ref"])
-            if p < -threshold:
-                sig_base_dec.append((c, p))
+    sig_base_dec = [
+        (c, c["base_pct"]) for c in base_changes if c["base_pct"] < -threshold
+    ]
     sig_base_dec.sort(key=lambda x: x[1])
 
     if sig_base_dec:
         for c, p in sig_base_dec:
-            print(f"  [{c['runtime']}] {c['pallet']}::{c['function']}")
-            print(
-                f"    base ref_time: {c['old']['base_ref']:,} -> {c['new']['base_ref']:,} ({p:+.1f}%)"
+            emit(f"  [{c['runtime']}] {c['pallet']}::{c['function']}")
+            emit(
+                f"    base ref_time: {_fmt_int(c['old'].base_ref)} -> {_fmt_int(c['new'].base_ref)} ({p:+.1f}%)"
             )
     else:
-        print("  None found.")
+        emit("  None found.")
 
     # ------------------------------------------------------------------
     # 3. PER-VARIABLE MULTIPLIER CHANGES > threshold
     # ------------------------------------------------------------------
-    print(f"\n{sep}")
-    print(
+    emit(f"\n{sep}")
+    emit(
         f"SECTION 3: PER-VARIABLE ref_time MULTIPLIER CHANGES > {threshold:.0f}%"
     )
-    print(sep)
-
-    sig_mul = []
-    for c in all_changes:
-        old_muls = c["old"]["ref_multipliers"]
-        new_muls = c["new"]["ref_multipliers"]
-        all_vars = set(old_muls.keys()) | set(new_muls.keys())
+    emit(sep)
+
+    by_fn = defaultdict(list)
+    for c in mul_changes:
+        old_muls = c["old"].ref_multipliers
+        new_muls = c["new"].ref_multipliers
+        key = f"[{c['runtime']}] {c['pallet']}::{c['function']}"
+        all_vars = old_muls.keys() | new_muls.keys()
         for var in all_vars:
             old_val = old_muls.get(var, 0)
             new_val = new_muls.get(var, 0)
             if old_val > 0 and new_val > 0:
                 p = pct(old_val, new_val)
                 if abs(p) > threshold:
-                    sig_mul.append((c, var, old_val, new_val, p))
+                    by_fn[key].append((c, var, old_val, new_val, p))
             elif old_val == 0 and new_val > 0:
-                sig_mul.append((c, var, old_val, new_val, float("inf")))
+                by_fn[key].append((c, var, old_val, new_val, float("inf")))
             elif old_val > 0 and new_val == 0:
-                sig_mul.append((c, var, old_val, new_val, -100.0))
-
-    sig_mul.sort(
-        key=lambda x: abs(x[4]) if x[4] != float("inf") else 999999, reverse=True
-    )
-
-    if sig_mul:
-        by_fn = defaultdict(list)
-        for entry in sig_mul:
-            c, var, old_val, new_val, p = entry
-            key = f"[{c['runtime']}] {c['pallet']}::{c['function']}"
-            by_fn[key].append(entry)
+                by_fn[key].append((c, var, old_val, new_val, -100.0))
 
+    if by_fn:
         for key in sorted(by_fn.keys()):
             entries = by_fn[key]
+            entries.sort(
+                key=lambda x: abs(x[4]) if x[4] != float("inf") else 999999,
+                reverse=True,
+            )
             c0 = entries[0][0]
-            print(f"\n  {key}")
+            emit(f"\n  {key}")
 
             for c, var, old_val, new_val, p in entries:
                 if p == float("inf"):
@@ -365,60 +522,57 @@ def main():
                     pstr = "REMOVED"
                 else:
                     pstr = f"{p:+.1f}%"
-                print(
+                emit(
                     f"    per-{var} ref_time: {format_weight(old_val)} -> {format_weight(new_val)} ({pstr})"
                 )
 
-            old_reads_per = c0["old"]["db_reads_per_var"]
-            new_reads_per = c0["new"]["db_reads_per_var"]
-            all_read_vars = set(old_reads_per.keys()) | set(new_reads_per.keys())
+            old_reads_per = c0["old"].db_reads_per_var
+            new_reads_per = c0["new"].db_reads_per_var
+            all_read_vars = old_reads_per.keys() | new_reads_per.keys()
             for rv in all_read_vars:
                 or_val = old_reads_per.get(rv, 0)
                 nr_val = new_reads_per.get(rv, 0)
                 if or_val != nr_val:
-                    print(f"    per-{rv} DB reads: {or_val} -> {nr_val}")
+                    emit(f"    per-{rv} DB reads: {or_val} -> {nr_val}")
     else:
-        print("  None found.")
+        emit("  None found.")
 
     # ------------------------------------------------------------------
     # 4. MINIMUM EXECUTION TIME CHANGES > threshold
     # ------------------------------------------------------------------
-    print(f"\n{sep}")
-    print(f"SECTION 4: MINIMUM EXECUTION TIME CHANGES > {threshold:.0f}%")
-    print(sep)
-
-    sig_min = []
-    for c in all_changes:
-        old_min = c["old"]["min_execution_time"]
-        new_min = c["new"]["min_execution_time"]
-        if old_min and new_min and old_min > 0:
-            p = pct(old_min, new_min)
-            if abs(p) > threshold:
-                sig_min.append((c, old_min, new_min, p))
+    emit(f"\n{sep}")
+    emit(f"SECTION 4: MINIMUM EXECUTION TIME CHANGES > {threshold:.0f}%")
+    emit(sep)
+
+    sig_min = [
+        (c, c["old"].min_execution_time, c["new"].min_execution_time, c["min_pct"])
+        for c in timed_changes
+        if abs(c["min_pct"]) > threshold
+    ]
     sig_min.sort(key=lambda x: abs(x[3]), reverse=True)
 
     if sig_min:
         for c, old_min, new_min, p in sig_min:
             direction = "INCREASE" if p > 0 else "DECREASE"
-            print(f"  [{c['runtime']}] {c['pallet']}::{c['function']}")
-            print(
+            emit(f"  [{c['runtime']}] {c['pallet']}::{c['function']}")
+            emit(
                 f"    {direction}: {format_weight(old_min)} -> {format_weight(new_min)} ({p:+.1f}%)"
             )
     else:
-        print("  None found.")
+        emit("  None found.")
 
     # ------------------------------------------------------------------
     # 5. PROOF SIZE MULTIPLIER CHANGES > 100%
     # ------------------------------------------------------------------
-    print(f"\n{sep}")
-    print("SECTION 5: proof_size PER-VARIABLE CHANGES > 100%")
-    print(sep)
+    emit(f"\n{sep}")
+    emit("SECTION 5: proof_size PER-VARIABLE CHANGES > 100%")
+    emit(sep)
 
     sig_proof = []
-    for c in all_changes:
-        old_muls = c["old"]["proof_multipliers"]
-        new_muls = c["new"]["proof_multipliers"]
-        all_vars = set(old_muls.keys()) | set(new_muls.keys())
+    for c in proof_changes:
+        old_muls = c["old"].proof_multipliers
+        new_muls = c["new"].proof_multipliers
+        all_vars = old_muls.keys() | new_muls.keys()
         for var in all_vars:
             old_val = old_muls.get(var, 0)
             new_val = new_muls.get(var, 0)
@@ -436,35 +590,26 @@ def main():
     if sig_proof:
         for c, var, old_val, new_val, p in sig_proof:
             pstr = f"{p:+.1f}%" if p != float("inf") else "NEW"
-            print(f"  [{c['runtime']}] {c['pallet']}::{c['function']}")
-            print(
+            emit(f"  [{c['runtime']}] {c['pallet']}::{c['function']}")
+            emit(
                 f"    per-{var} proof_size: {format_weight(old_val)} -> {format_weight(new_val)} ({pstr})"
             )
     else:
-        print("  None found.")
+        emit("  None found.")
 
     # ------------------------------------------------------------------
     # 6. PER-RUNTIME SUMMARY
     # ------------------------------------------------------------------
-    print(f"\n{sep}")
-    print("SECTION 6: PER-RUNTIME SUMMARY")
-    print(sep)
+    emit(f"\n{sep}")
+    emit("SECTION 6: PER-RUNTIME SUMMARY")
+    emit(sep)
 
     for rt in ["moonbase", "moonbeam", "moonriver"]:
         rt_items = [c for c in all_changes if c["runtime"] == rt]
         if not rt_items:
             continue
 
-        rt_min_changes = []
-        for c in rt_items:
-            if (
-                c["old"]["min_execution_time"]
-                and c["new"]["min_execution_time"]
-                and c["old"]["min_execution_time"] > 0
-            ):
-                rt_min_changes.append(
-                    pct(c["old"]["min_execution_time"], c["new"]["min_execution_time"])
-                )
+        rt_min_changes = [c["min_pct"] for c in timed_changes if c["runtime"] == rt]
 
         if rt_min_changes:
             ups = len([p for p in rt_min_changes if p > 0])
@@ -472,41 +617,40 @@ def main():
             avg = sum(rt_min_changes) / len(rt_min_changes)
             big_ups = len([p for p in rt_min_changes if p > threshold])
             big_downs = len([p for p in rt_min_changes if p < -threshold])
-            print(f"\n  {rt}: {len(rt_items)} functions changed")
-            print(
+            emit(f"\n  {rt}: {len(rt_items)} functions changed")
+            emit(
                 f"    Min exec time: {ups} increases, {downs} decreases, avg {avg:+.1f}%"
             )
             if big_ups or big_downs:
-                print(
+                emit(
                     f"    Flagged: {big_ups} increases >{threshold:.0f}%, {big_downs} decreases >{threshold:.0f}%"
                 )
 
     # ------------------------------------------------------------------
     # 7. FULL TABLE
     # ------------------------------------------------------------------
-    print(f"\n{sep}")
-    print("SECTION 7: ALL MINIMUM EXECUTION TIME CHANGES (sorted by |change|)")
-    print(sep)
-    print(
+    emit(f"\n{sep}")
+    emit("SECTION 7: ALL MINIMUM EXECUTION TIME CHANGES (sorted by |change|)")
+    emit(sep)
+    emit(
         f"{'Runtime':<12} {'Pallet':<45} {'Function':<40} {'Old':>12} {'New':>12} {'Change':>8}"
     )
-    print(f"{'-' * 12} {'-' * 45} {'-' * 40} {'-' * 12} {'-' * 12} {'-' * 8}")
+    emit(f"{'-' * 12} {'-' * 45} {'-' * 40} {'-' * 12} {'-' * 12} {'-' * 8}")
 
-    all_min = []
-    for c in all_changes:
-        old_min = c["old"]["min_execution_time"]
-        new_min = c["new"]["min_execution_time"]
-        if old_min and new_min and old_min > 0:
-            p = pct(old_min, new_min)
-            all_min.append((c, old_min, new_min, p))
+    all_min = [
+        (c, c["old"].min_execution_time, c["new"].min_execution_time, c["min_pct"])
+        for c in timed_changes
+    ]
     all_min.sort(key=lambda x: abs(x[3]), reverse=True)
 
     for c, old_min, new_min, p in all_min:
-        print(
+        emit(
             f"{c['runtime']:<12} {c['pallet']:<45} {c['function']:<40} "
             f"{format_weight(old_min):>12} {format_weight(new_min):>12} {p:>+7.1f}%"
         )
 
+    sys.stdout.write("\n".join(buf) + "\n")
+
 
 if __name__ == "__main__":
     main()